@@ -1,6 +1,6 @@
 """
 PCTE Lost & Found Management System - Final Python Code
-Single-file Python app using Tkinter/ttkbootstrap (optional), SQLite, NLTK, scikit-learn, Pillow.
+Single-file Python app using Tkinter/ttkbootstrap (optional), SQLite, scikit-learn, Pillow.
 Enhanced features:
 - Modern UI using ttkbootstrap (falls back to ttk)
 - Dark Mode toggle (via settings)
@@ -11,31 +11,35 @@ Enhanced features:
 - PDF report generator (reportlab; optional)
 
 Install required packages (recommended):
-pip install nltk scikit-learn pillow reportlab ttkbootstrap twilio
+pip install scikit-learn pillow reportlab ttkbootstrap twilio
 
 Run:
 python PCTE_Lost_and_Found_System.py
 """
 
 import os
+import re
 import sqlite3
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, font as tkfont
 import shutil
+import errno
 import uuid
 import datetime
 import hashlib
+import hmac
 import json
+import functools
+import collections
+import concurrent.futures
+import threading
 
-from PIL import Image, ImageTk
+import numpy as np
+from PIL import Image, ImageOps, ImageTk
 
 # NLP
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
-from nltk.tokenize import word_tokenize
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, ENGLISH_STOP_WORDS
+from sklearn.pipeline import make_pipeline
 
 # Optional: reportlab for PDF
 try:
@@ -53,37 +57,102 @@ try:
 except Exception:
     UI_BOOTSTRAP = False
 
-# Optional Twilio
+# Optional: Annoy approximate nearest neighbours for large corpora
 try:
-    from twilio.rest import Client as TwilioClient
-    TWILIO_AVAILABLE = True
+    from annoy import AnnoyIndex
+    from sklearn.decomposition import TruncatedSVD
+    ANNOY_AVAILABLE = True
 except Exception:
-    TWILIO_AVAILABLE = False
+    ANNOY_AVAILABLE = False
 
-# Ensure NLTK data
+# Optional: orjson for faster settings load/save
 try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
 
+# Optional Twilio
 try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+    from twilio.rest import Client as TwilioClient
+    TWILIO_AVAILABLE = True
+except Exception:
+    TWILIO_AVAILABLE = False
 
-STOPWORDS = set(stopwords.words('english'))
-STEMMER = PorterStemmer()
+STOPWORDS = ENGLISH_STOP_WORDS
+# Words of two or more letters; same shape as the vectorizer token_pattern below
+TOKEN_RE = re.compile(r'[a-z]{2,}')
+TOKEN_PATTERN = r'(?u)\b[a-z]{2,}\b'
+# Hashed feature space used instead of a fitted vocabulary
+HASH_FEATURES = 2**18
+# HashingVectorizer is stateless, so one instance serves every corpus build and query
+HASHER = HashingVectorizer(n_features=HASH_FEATURES, alternate_sign=False, norm=None, lowercase=False, token_pattern=TOKEN_PATTERN)
+# sublinear tf damps repeated words, which helps on short item descriptions
+TFIDF_KWARGS = dict(sublinear_tf=True, norm='l2')
 
 # Paths & constants
 DB_PATH = 'items.db'
+# bytes of the database file SQLite may memory-map
+DB_MMAP_SIZE = 256 * 1024 * 1024
 IMAGES_DIR = 'images'
+THUMBS_DIR = os.path.join(IMAGES_DIR, 'thumbs')
+# Uploads larger than this are stored downscaled instead of at full resolution
+STORED_IMAGE_MAX = (1024, 1024)
+# Stored thumbnails are at least as large as any size the UI displays
+THUMB_SIZE = (300, 300)
 SETTINGS_FILE = 'settings.json'
+# Pixel memory (RGBA bytes) of decoded PhotoImages kept for reuse; widgets and tree rows hold their own references
+PHOTO_CACHE_BYTES = 64 * 1024 * 1024
+# Thumbnail size used inside dashboard tree rows
+ROW_ICON_SIZE = (32, 32)
+# Threads decoding dashboard row icons ahead of the tree update
+DECODE_WORKERS = 4
+# Delay after the last search keystroke / view switch before the list or dashboard is refreshed
+DEBOUNCE_MS = 150
+# Corpora at least this large are searched through an Annoy index (when installed); below it the exact
+# scan answers in about 10 ms or less, which does not pay for the recall the index gives up
+ANN_MIN_ITEMS = 200000
+ANN_COMPONENTS = 128
+ANN_TREES = 10
+# Annoy candidates fetched per requested match, re-scored exactly afterwards
+ANN_CANDIDATES = 10
+# Rows added since the Annoy index was built are scored exactly; past this share of the corpus it is rebuilt
+ANN_REBUILD_FRACTION = 0.1
+# Query rows scored per sparse product in find_matches_batch, bounding the dense score block
+MATCH_BATCH_ROWS = 256
 os.makedirs(IMAGES_DIR, exist_ok=True)
+os.makedirs(THUMBS_DIR, exist_ok=True)
+
+
+def fts_query(search):
+    """Turn free search text into an FTS5 query: every word must match as a prefix.
+
+    Words are quoted, so FTS5 operators and punctuation typed by the user are never parsed as query syntax.
+    """
+    words = re.findall(r'\w+', search)
+    if not words:
+        return None
+    return ' '.join(f'"{w}"*' for w in words)
 
 
 class DB:
     def __init__(self, path=DB_PATH):
-        self.conn = sqlite3.connect(path)
+        self.path = path
+        # shared with the matching worker thread; every use of the connection holds _lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        # WAL lets readers run alongside writes; NORMAL sync is safe under WAL and avoids an fsync per commit
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute('PRAGMA cache_size=-20000')
+        # read the database file through a memory map instead of read() calls
+        self.conn.execute(f'PRAGMA mmap_size={DB_MMAP_SIZE}')
+        # bumped on every write so caches built from the items table know when they are stale
+        self.version = 0
+        # (username, sha256 of password) pairs already verified in this process
+        self._verified = set()
         self._create()
 
     def _create(self):
@@ -97,115 +166,390 @@ class DB:
                 place TEXT,
                 date TEXT,
                 contact TEXT,
-                image_path TEXT
+                image_path TEXT,
+                thumb_path TEXT
             )
         ''')
         cur.execute('''
             CREATE TABLE IF NOT EXISTS admin (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT UNIQUE,
-                password_hash TEXT
+                password_hash TEXT,
+                salt BLOB
             )
         ''')
+        # admin rows from older versions keep their unsalted SHA-256 hash until the next login
+        self._ensure_column(cur, 'admin', 'salt', 'BLOB')
+        self._ensure_column(cur, 'items', 'thumb_path', 'TEXT')
+        # (type, date) serves the type-filtered queries; it replaces the older type-only index
+        cur.execute('DROP INDEX IF EXISTS idx_items_type')
+        cur.execute('CREATE INDEX IF NOT EXISTS idx_items_type_date ON items(type, date)')
+        self.fts = self._create_fts(cur)
         self.conn.commit()
         cur.execute('SELECT COUNT(*) FROM admin')
         if cur.fetchone()[0] == 0:
             self.add_admin('admin', 'admin123')
 
+    def _ensure_column(self, cur, table, column, decl):
+        # add columns introduced after a database file was first created
+        cur.execute(f'PRAGMA table_info({table})')
+        if column not in [r[1] for r in cur.fetchall()]:
+            cur.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+
+    def _create_fts(self, cur):
+        cur.execute("SELECT sql FROM sqlite_master WHERE name='items_fts'")
+        row = cur.fetchone()
+        if row is not None and 'contact' not in row[0]:
+            # created by an older version that did not index contact; rebuilt below
+            for trigger in ('items_fts_ai', 'items_fts_ad', 'items_fts_au'):
+                cur.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cur.execute('DROP TABLE items_fts')
+            row = None
+        exists = row is not None
+        try:
+            cur.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS items_fts
+                USING fts5(name, description, place, contact, content='items', content_rowid='rowid')
+            ''')
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; get_items falls back to LIKE
+            return False
+        cur.execute('''
+            CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+                INSERT INTO items_fts (rowid, name, description, place, contact) VALUES (new.rowid, new.name, new.description, new.place, new.contact);
+            END
+        ''')
+        cur.execute('''
+            CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+                INSERT INTO items_fts (items_fts, rowid, name, description, place, contact) VALUES ('delete', old.rowid, old.name, old.description, old.place, old.contact);
+            END
+        ''')
+        cur.execute('''
+            CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE ON items BEGIN
+                INSERT INTO items_fts (items_fts, rowid, name, description, place, contact) VALUES ('delete', old.rowid, old.name, old.description, old.place, old.contact);
+                INSERT INTO items_fts (rowid, name, description, place, contact) VALUES (new.rowid, new.name, new.description, new.place, new.contact);
+            END
+        ''')
+        if not exists:
+            # index rows stored before the FTS table existed
+            cur.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")
+        return True
+
     def add_admin(self, username, password):
         cur = self.conn.cursor()
-        ph = self.hash_password(password)
+        salt = os.urandom(16)
+        ph = self.hash_password(password, salt)
         try:
-            cur.execute('INSERT INTO admin (username, password_hash) VALUES (?,?)', (username, ph))
-            self.conn.commit()
+            with self._lock:
+                cur.execute('INSERT INTO admin (username, password_hash, salt) VALUES (?,?,?)', (username, ph, salt))
+                self.conn.commit()
         except sqlite3.IntegrityError:
             pass
 
     def verify_admin(self, username, password):
+        key = (username, hashlib.sha256(password.encode()).digest())
+        if key in self._verified:
+            return True
         cur = self.conn.cursor()
-        cur.execute('SELECT password_hash FROM admin WHERE username=?', (username,))
-        row = cur.fetchone()
+        with self._lock:
+            cur.execute('SELECT password_hash, salt FROM admin WHERE username=?', (username,))
+            row = cur.fetchone()
         if not row:
             return False
-        return self.verify_hash(password, row[0])
+        if not self.verify_hash(password, row[0], row[1]):
+            return False
+        if row[1] is None:
+            # upgrade a legacy SHA-256 hash now that the plain password is known
+            salt = os.urandom(16)
+            with self._lock:
+                cur.execute('UPDATE admin SET password_hash=?, salt=? WHERE username=?', (self.hash_password(password, salt), salt, username))
+                self.conn.commit()
+        self._verified.add(key)
+        return True
 
-    def hash_password(self, password):
-        return hashlib.sha256(password.encode()).hexdigest()
+    def hash_password(self, password, salt):
+        return hashlib.scrypt(password.encode(), salt=salt, n=2**14, r=8, p=1, maxmem=64*1024*1024).hex()
 
-    def verify_hash(self, password, hashval):
-        return hashlib.sha256(password.encode()).hexdigest() == hashval
+    def verify_hash(self, password, hashval, salt=None):
+        if salt is None:
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashval)
+        return hmac.compare_digest(self.hash_password(password, salt), hashval)
+
+    INSERT_ITEM_SQL = 'INSERT INTO items (id,type,name,description,place,date,contact,image_path,thumb_path) VALUES (?,?,?,?,?,?,?,?,?)'
+
+    def _item_params(self, item):
+        return (item['id'], item['type'], item['name'], item['description'], item['place'], item['date'], item['contact'], item['image_path'], item.get('thumb_path'))
 
     def add_item(self, item):
-        cur = self.conn.cursor()
-        cur.execute('''INSERT INTO items (id,type,name,description,place,date,contact,image_path) VALUES (?,?,?,?,?,?,?,?)''', (
-            item['id'], item['type'], item['name'], item['description'], item['place'], item['date'], item['contact'], item['image_path']
-        ))
-        self.conn.commit()
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute(self.INSERT_ITEM_SQL, self._item_params(item))
+            self.conn.commit()
+            self.version += 1
 
-    def get_items(self, type=None, search=None):
+    def add_items(self, items):
+        # one transaction and one prepared statement for bulk imports
+        with self._lock, self.conn:
+            self.conn.executemany(self.INSERT_ITEM_SQL, (self._item_params(it) for it in items))
+            self.version += 1
+
+    def _select_items(self, type=None, search=None, columns='items.*'):
         cur = self.conn.cursor()
-        if type and search:
-            cur.execute('SELECT * FROM items WHERE type=? AND (name LIKE ? OR description LIKE ? OR place LIKE ?)', (type, f'%{search}%', f'%{search}%', f'%{search}%'))
+        match = fts_query(search) if search and self.fts else None
+        if type and match:
+            cur.execute(f'SELECT {columns} FROM items_fts JOIN items ON items.rowid=items_fts.rowid WHERE items_fts MATCH ? AND items.type=? ORDER BY rank', (match, type))
+        elif match:
+            cur.execute(f'SELECT {columns} FROM items_fts JOIN items ON items.rowid=items_fts.rowid WHERE items_fts MATCH ? ORDER BY rank', (match,))
+        elif type and search:
+            cur.execute(f'SELECT {columns} FROM items WHERE type=? AND (name LIKE ? OR description LIKE ? OR place LIKE ? OR contact LIKE ?)', (type, f'%{search}%', f'%{search}%', f'%{search}%', f'%{search}%'))
         elif type:
-            cur.execute('SELECT * FROM items WHERE type=?', (type,))
+            cur.execute(f'SELECT {columns} FROM items WHERE type=?', (type,))
         elif search:
-            cur.execute('SELECT * FROM items WHERE name LIKE ? OR description LIKE ? OR place LIKE ?', (f'%{search}%', f'%{search}%', f'%{search}%'))
+            cur.execute(f'SELECT {columns} FROM items WHERE name LIKE ? OR description LIKE ? OR place LIKE ? OR contact LIKE ?', (f'%{search}%', f'%{search}%', f'%{search}%', f'%{search}%'))
         else:
-            cur.execute('SELECT * FROM items')
-        rows = cur.fetchall()
-        cols = ['id','type','name','description','place','date','contact','image_path']
-        return [dict(zip(cols,row)) for row in rows]
+            cur.execute(f'SELECT {columns} FROM items')
+        return cur
+
+    def get_items(self, type=None, search=None):
+        # sqlite3.Row supports it['col']; callers that need a mutable dict copy with dict(row)
+        with self._lock:
+            return self._select_items(type, search).fetchall()
+
+    # item list columns, truncated by SQLite so rows arrive ready to insert
+    LIST_COLUMNS = 'items.id, items.type, substr(items.name,1,30), substr(items.place,1,20), items.date, substr(items.contact,1,20)'
+
+    def list_rows(self, search=None):
+        with self._lock:
+            return [tuple(r) for r in self._select_items(search=search, columns=self.LIST_COLUMNS)]
+
+    def count_items(self, type):
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute('SELECT COUNT(*) FROM items WHERE type=?', (type,))
+            return cur.fetchone()[0]
 
     def close(self):
         self.conn.close()
 
 
+@functools.lru_cache(maxsize=4096)
 def preprocess(text):
     if not text:
         return ''
-    text = text.lower()
-    tokens = word_tokenize(text)
-    tokens = [t for t in tokens if t.isalpha() and t not in STOPWORDS]
-    tokens = [STEMMER.stem(t) for t in tokens]
-    return ' '.join(tokens)
+    return ' '.join(t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS)
+
+
+def top_k(sims, topk):
+    """Indices of the topk highest scores, best first, without sorting the whole array."""
+    sims = np.asarray(sims)
+    if topk < len(sims):
+        idx = np.argpartition(-sims, topk)[:topk]
+        return idx[np.argsort(-sims[idx], kind='stable')]
+    return np.argsort(-sims, kind='stable')
 
 
 class Matcher:
+    # everything build() derives from one corpus; stashed per item type so switching types does not refit
+    INDEX_ATTRS = ('vectorizer', 'corpus_ids', 'corpus_texts', 'corpus_matrix', '_corpus_items', '_id_to_item',
+                   '_svd', '_ann', '_ann_cols', '_ann_ids', '_ann_rows', '_ann_new')
+    # the part of an index that outlives a DB version, see _build_ann
+    ANN_ATTRS = ('_svd', '_ann', '_ann_cols', '_ann_ids')
+
     def __init__(self, db: DB):
         self.db = db
         self.vectorizer = None
         self.corpus_ids = []
         self.corpus_texts = []
+        self.corpus_matrix = None
+        self._corpus_items = []
+        self._id_to_item = {}
+        self._svd = None
+        self._ann = None
+        self._ann_cols = None
+        self._ann_ids = None
+        self._ann_rows = None
+        self._ann_new = None
+        self._built_for_type = None
+        self._built_version = None
+        # item type -> (DB version, {attr: value}) for indexes not currently active
+        self._indexes = {}
+        # opposite type -> latest Annoy index (ANN_ATTRS), reused across versions
+        self._anns = {}
+        # item id -> (raw text, preprocessed text); raw text is kept so edited rows are re-processed
+        self._prep_cache = {}
+        # (opposite type, query text, topk) -> results, valid for DB version _match_cache_version only
+        self._match_cache = {}
+        self._match_cache_version = None
+        # the indexes and caches above are rebuilt in place, so matching runs one call at a time
+        self._lock = threading.RLock()
+
+    def _preprocessed(self, it):
+        raw = (it['name'] or '') + ' ' + (it['description'] or '') + ' ' + (it['place'] or '')
+        cached = self._prep_cache.get(it['id'])
+        if cached is None or cached[0] != raw:
+            cached = (raw, preprocess(raw))
+            self._prep_cache[it['id']] = cached
+        return cached[1]
 
     def build(self, opposite_type):
+        # read once, before the SELECT: a row inserted meanwhile leaves the index one version behind, never marked current
+        version = self.db.version
+        if opposite_type == self._built_for_type and version == self._built_version:
+            return
+        if self._built_for_type is not None and opposite_type != self._built_for_type:
+            self._indexes[self._built_for_type] = (self._built_version, {a: getattr(self, a) for a in self.INDEX_ATTRS})
+        # indexes from older versions are never restored, so only current ones are kept
+        self._indexes = {t: s for t, s in self._indexes.items() if s[0] == version}
+        stashed = self._indexes.get(opposite_type)
+        if stashed is not None and stashed[0] == version:
+            for a, v in stashed[1].items():
+                setattr(self, a, v)
+            self._built_for_type = opposite_type
+            self._built_version = version
+            return
         items = self.db.get_items(type=opposite_type)
+        self._corpus_items = items
+        self._id_to_item = {it['id']: it for it in items}
         self.corpus_ids = [it['id'] for it in items]
-        self.corpus_texts = [preprocess((it['name'] or '') + ' ' + (it['description'] or '') + ' ' + (it['place'] or '')) for it in items]
+        self.corpus_texts = [self._preprocessed(it) for it in items]
+        self._built_for_type = opposite_type
+        self._built_version = version
         if len(self.corpus_texts) == 0:
             self.vectorizer = None
+            self.corpus_matrix = None
+            self._svd = None
+            self._ann = None
+            self._ann_cols = None
+            self._ann_ids = None
+            self._ann_rows = None
+            self._ann_new = None
+            return
+        # hashing needs no vocabulary pass; only the IDF weights are fitted on the corpus
+        tfidf = TfidfTransformer(**TFIDF_KWARGS)
+        counts = HASHER.transform(self.corpus_texts)
+        tfidf.fit(counts)
+        # zero the weight of features absent from the corpus so unknown query words are ignored, as with a vocabulary
+        df = np.bincount(counts.indices, minlength=HASH_FEATURES)
+        tfidf.idf_ = np.where(df > 0, tfidf.idf_, 0.0)
+        self.vectorizer = make_pipeline(HASHER, tfidf)
+        self.corpus_matrix = tfidf.transform(counts)
+        self._build_ann(self._anns.get(opposite_type, {}))
+        self._anns[opposite_type] = {a: getattr(self, a) for a in self.ANN_ATTRS}
+
+    def _build_ann(self, prev):
+        self._svd = None
+        self._ann = None
+        self._ann_cols = None
+        self._ann_ids = None
+        self._ann_rows = None
+        self._ann_new = None
+        n_items = self.corpus_matrix.shape[0]
+        if not ANNOY_AVAILABLE or n_items < ANN_MIN_ITEMS:
             return
-        self.vectorizer = TfidfVectorizer().fit(self.corpus_texts)
+        if prev.get('_ann') is not None:
+            # every insert bumps the DB version; keep the previous index and score the rows it lacks exactly
+            row_of = {id_: i for i, id_ in enumerate(self.corpus_ids)}
+            rows = np.array([row_of.get(id_, -1) for id_ in prev['_ann_ids']], dtype=int)
+            new = np.setdiff1d(np.arange(n_items), rows)
+            if len(new) + np.count_nonzero(rows < 0) <= n_items * ANN_REBUILD_FRACTION:
+                for a in self.ANN_ATTRS:
+                    setattr(self, a, prev[a])
+                self._ann_rows = rows
+                self._ann_new = new
+                return
+        # the corpus only touches a few hundred of the hashed columns; fitting on all of them wastes time and memory
+        cols = np.unique(self.corpus_matrix.indices)
+        n_components = min(ANN_COMPONENTS, len(cols) - 1, n_items - 1)
+        if n_components < 2:
+            return
+        compact = self.corpus_matrix[:, cols]
+        self._svd = TruncatedSVD(n_components=n_components).fit(compact)
+        self._ann_cols = cols
+        reduced = self._svd.transform(compact).astype(np.float32)
+        self._ann = AnnoyIndex(n_components, 'angular')
+        for i, vec in enumerate(reduced):
+            self._ann.add_item(i, vec)
+        self._ann.build(ANN_TREES)
+        self._ann_ids = self.corpus_ids
+        self._ann_rows = np.arange(n_items)
+        self._ann_new = np.arange(0)
+
+    def _query_text(self, item):
+        # query items come from the DB too, so they share the corpus cache instead of being re-tokenized on every refresh
+        if 'id' in item.keys() and item['id'] is not None:
+            return self._preprocessed(item)
+        return preprocess((item['name'] or '') + ' ' + (item['description'] or '') + ' ' + (item['place'] or ''))
+
+    def _rank(self, qv, topk):
+        if self._ann is not None:
+            # approximate candidates from the index, then exact scores for those rows only
+            nns = self._ann.get_nns_by_vector(self._svd.transform(qv[:, self._ann_cols])[0], topk * ANN_CANDIDATES)
+            rows = self._ann_rows[nns]
+            cand = np.concatenate([rows[rows >= 0], self._ann_new])
+            sims = (self.corpus_matrix[cand] @ qv.T).toarray().ravel()
+            ranked = [(cand[i], sims[i]) for i in top_k(sims, topk)]
+        else:
+            # TF-IDF rows are L2-normalized, so the sparse dot product already is the cosine similarity
+            sims = (self.corpus_matrix @ qv.T).toarray().ravel()
+            ranked = [(i, sims[i]) for i in top_k(sims, topk)]
+        return ranked
 
-    def find_matches(self, item, topk=5):
-        opposite = 'found' if item['type']=='lost' else 'lost'
-        self.build(opposite)
-        if not self.vectorizer:
-            return []
-        query = preprocess((item.get('name') or '') + ' ' + (item.get('description') or '') + ' ' + (item.get('place') or ''))
-        qv = self.vectorizer.transform([query])
-        corpus_v = self.vectorizer.transform(self.corpus_texts)
-        sims = cosine_similarity(qv, corpus_v)[0]
-        ranked = sorted(list(zip(self.corpus_ids, sims)), key=lambda x: x[1], reverse=True)
+    def _results(self, ranked):
         results = []
-        all_opposite = self.db.get_items(type=opposite)
-        for cid,score in ranked[:topk]:
-            rows = [it for it in all_opposite if it['id']==cid]
-            if rows:
-                it = rows[0]
-                it['_score'] = float(score)
-                results.append(it)
+        for i, score in ranked:
+            # copy so the cached corpus rows never carry a per-query score
+            it = dict(self._id_to_item[self.corpus_ids[i]])
+            it['_score'] = float(score)
+            results.append(it)
         return results
 
+    def find_matches(self, item, topk=5):
+        with self._lock:
+            opposite = 'found' if item['type']=='lost' else 'lost'
+            # read once so a concurrent insert cannot make the cache look newer than the results stored in it
+            version = self.db.version
+            # an index already built for this version knows whether the corpus is empty; only ask SQLite otherwise
+            built = opposite == self._built_for_type and version == self._built_version
+            if not built and self.db.count_items(opposite) == 0:
+                return []
+            if self._match_cache_version != version:
+                self._match_cache.clear()
+                self._match_cache_version = version
+            # results depend only on the query text and the corpus, so items without an id are cached safely too
+            text = self._query_text(item)
+            key = (opposite, text, topk)
+            if key in self._match_cache:
+                return self._match_cache[key]
+            self.build(opposite)
+            if not self.vectorizer:
+                return []
+            qv = self.vectorizer.transform([text])
+            results = self._results(self._rank(qv, topk))
+            self._match_cache[key] = results
+            return results
+
+    def find_matches_batch(self, items, topk=5):
+        """find_matches for many items at once: one build per opposite type and one sparse product per block of queries."""
+        with self._lock:
+            results = [[] for _ in items]
+            by_opposite = {}
+            for n, it in enumerate(items):
+                by_opposite.setdefault('found' if it['type']=='lost' else 'lost', []).append(n)
+            for opposite, positions in by_opposite.items():
+                self.build(opposite)
+                if not self.vectorizer:
+                    continue
+                Q = self.vectorizer.transform([self._query_text(items[n]) for n in positions])
+                if self._ann is not None:
+                    for row, n in enumerate(positions):
+                        results[n] = self._results(self._rank(Q[row], topk))
+                    continue
+                for start in range(0, len(positions), MATCH_BATCH_ROWS):
+                    S = (Q[start:start + MATCH_BATCH_ROWS] @ self.corpus_matrix.T).toarray()
+                    for sims, n in zip(S, positions[start:start + MATCH_BATCH_ROWS]):
+                        results[n] = self._results([(i, sims[i]) for i in top_k(sims, topk)])
+            return results
+
 
 class Settings:
     def __init__(self, path=SETTINGS_FILE):
@@ -223,25 +567,41 @@ class Settings:
                 'theme':'cosmo', 'dark':False
             }
         }
+        # set by update() when a value differs from what is on disk; save() is a no-op otherwise
+        self.dirty = False
         self.load()
 
     def load(self):
         if os.path.exists(self.path):
             try:
-                with open(self.path,'r') as f:
-                    loaded = json.load(f)
-                    # merge safely
-                    for k,v in loaded.items():
-                        if isinstance(v, dict) and k in self.data:
-                            self.data[k].update(v)
-                        else:
-                            self.data[k] = v
+                with open(self.path,'rb') as f:
+                    raw = f.read()
+                loaded = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+                # merge safely
+                for k,v in loaded.items():
+                    if isinstance(v, dict) and k in self.data:
+                        self.data[k].update(v)
+                    else:
+                        self.data[k] = v
             except Exception:
                 pass
 
+    def update(self, section, values):
+        current = self.data.setdefault(section, {})
+        if any(current.get(k) != v for k, v in values.items()):
+            current.update(values)
+            self.dirty = True
+
     def save(self):
-        with open(self.path,'w') as f:
-            json.dump(self.data, f, indent=2)
+        if not self.dirty:
+            return
+        if ORJSON_AVAILABLE:
+            with open(self.path,'wb') as f:
+                f.write(orjson.dumps(self.data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(self.path,'w') as f:
+                json.dump(self.data, f, indent=2)
+        self.dirty = False
 
 
 import smtplib
@@ -284,6 +644,64 @@ class Notifier:
             return False, str(e)
 
 
+_cross_device_logged = False
+
+
+def store_image(src, dest):
+    """Put an uploaded image into IMAGES_DIR and return the path written.
+
+    Images larger than STORED_IMAGE_MAX are re-encoded downscaled and upright (EXIF orientation applied):
+    as PNG when they have transparency, otherwise as JPEG keeping their EXIF data. dest gets the matching extension.
+    Others are hard-linked, or copied when linking is impossible.
+    """
+    global _cross_device_logged
+    try:
+        with Image.open(src) as img:
+            if max(img.size) > max(STORED_IMAGE_MAX):
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail(STORED_IMAGE_MAX, Image.Resampling.LANCZOS)
+                if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info:
+                    dest = os.path.splitext(dest)[0] + '.png'
+                    img.save(dest, 'PNG', optimize=True)
+                else:
+                    dest = os.path.splitext(dest)[0] + '.jpg'
+                    img.convert('RGB').save(dest, 'JPEG', quality=85, optimize=True, exif=img.getexif())
+                return dest
+    except Exception as e:
+        print('Image error', e)
+    try:
+        os.link(src, dest)
+        return dest
+    except OSError as e:
+        if e.errno == errno.EXDEV and not _cross_device_logged:
+            print('Images come from another filesystem; copying instead of linking')
+            _cross_device_logged = True
+    shutil.copyfile(src, dest)
+    return dest
+
+
+def make_thumbnail(path):
+    """Save a downscaled WebP copy of an uploaded image in THUMBS_DIR; returns its path or None."""
+    try:
+        thumb = os.path.join(THUMBS_DIR, os.path.splitext(os.path.basename(path))[0] + '.webp')
+        with Image.open(path) as img:
+            img.thumbnail(THUMB_SIZE, Image.Resampling.LANCZOS)
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA')
+            img.save(thumb, 'WEBP', quality=80)
+        return thumb
+    except Exception as e:
+        print('Thumb error', e)
+        return None
+
+
+def decode_image(path, size):
+    """Open an image and shrink it to fit size; PIL work only, so it may run off the Tk thread."""
+    img = Image.open(path)
+    img.thumbnail(size)
+    return img
+
+
 def generate_pdf_report(item, matches, filename):
     if not REPORTLAB_AVAILABLE:
         raise RuntimeError('reportlab not available')
@@ -299,22 +717,24 @@ def generate_pdf_report(item, matches, filename):
     c.drawString(40, y, 'Description:')
     y -= 20
     text = c.beginText(45, y)
-    text.setFont('Helvetica', 10)
-    for line in (item.get('description') or '').split('\n'):
-        text.textLine(line)
-        y -= 14
+    text.setFont('Helvetica', 10, leading=14)
+    text.textLines(item.get('description') or '', trim=0)
     c.drawText(text)
-    y -= 20
+    y = text.getY() - 20
     c.setFont('Helvetica-Bold', 12)
     c.drawString(40, y, 'Matches:')
     y -= 20
-    c.setFont('Helvetica', 10)
+    # one text object per page instead of a drawString per match
+    text = c.beginText(45, y)
+    text.setFont('Helvetica', 10, leading=16)
     for m in matches:
-        if y < 80:
+        if text.getY() < 80:
+            c.drawText(text)
             c.showPage()
-            y = h - 40
-        c.drawString(45, y, f"- {m['type'].title()} | {m['name']} | Score: {m.get('_score',0):.2f} | Place: {m.get('place','')} | Contact: {m.get('contact','')}")
-        y -= 16
+            text = c.beginText(45, h - 40)
+            text.setFont('Helvetica', 10, leading=16)
+        text.textLine(f"- {m['type'].title()} | {m['name']} | Score: {m.get('_score',0):.2f} | Place: {m.get('place','')} | Contact: {m.get('contact','')}")
+    c.drawText(text)
     c.save()
 
 
@@ -325,6 +745,290 @@ class AppBase:
         self.settings = Settings()
         self.notifier = Notifier(self.settings)
         self.selected_image_path = None
+        self.selected_thumb_path = None
+        # (path, mtime, size) -> PhotoImage in LRU order, shared by every widget showing that image
+        self._photo_cache = collections.OrderedDict()
+        self._photo_cache_bytes = 0
+        # dashboard state: rows and matches per item id, and the PhotoImages its rows display
+        self._dashboard_items = {}
+        self._dashboard_matches = {}
+        self._dashboard_images = {}
+        # pending after() ids of debounced callbacks, by name
+        self._after_ids = {}
+        # searches run on one worker thread; _search_seq drops stale results
+        self._search_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._search_seq = 0
+        # matching runs on its own worker so the UI stays responsive; _dashboard_seq drops stale refreshes
+        self._match_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._dashboard_seq = 0
+        # decoded PIL images waiting to become PhotoImages (which must be created on the Tk thread), keyed like _photo_cache
+        self._decode_pool = concurrent.futures.ThreadPoolExecutor(max_workers=DECODE_WORKERS)
+        self._decoded = {}
+        # (popup window, match id) -> match shown in an open match popup
+        self._popup_matches = {}
+
+    def _debounce(self, name, callback, delay=DEBOUNCE_MS):
+        # coalesce bursts of events: callback runs once, delay ms after the last call for this name
+        after_id = self._after_ids.pop(name, None)
+        if after_id is not None:
+            self.after_cancel(after_id)
+
+        def run():
+            self._after_ids.pop(name, None)
+            callback()
+        self._after_ids[name] = self.after(delay, run)
+
+    def _configure_styles(self):
+        # fonts and styles are resolved once; widgets refer to them by name instead of passing font tuples
+        self._bold_font = tkfont.nametofont('TkDefaultFont').copy()
+        self._bold_font.configure(size=12, weight='bold')
+        style = ttk.Style()
+        style.configure('Title.TLabel', font=self._bold_font)
+        style.configure('Match.TLabel', foreground='blue')
+        style.configure('Dashboard.Treeview', rowheight=ROW_ICON_SIZE[1] + 6)
+
+    def _schedule_refresh(self, *args):
+        self._debounce('search', self.refresh_list)
+
+    def _schedule_dashboard(self, *args):
+        self._debounce('dashboard', self.populate_matches)
+
+    def _search_rows(self, search):
+        return [(r[0], r[1:]) for r in self.db.list_rows(search)]
+
+    def _fill_list(self, seq, future):
+        if seq != self._search_seq:
+            return
+        try:
+            rows = future.result()
+        except Exception as e:
+            print('Search error', e)
+            return
+        self.tree.delete(*self.tree.get_children())
+        # hide the columns while inserting so the tree is not re-laid out per row
+        self.tree.configure(displaycolumns=())
+        for iid, values in rows:
+            self.tree.insert('', 'end', iid=iid, values=values)
+        self.tree.configure(displaycolumns='#all')
+
+    def _match_rows(self, vtype):
+        # worker thread: DB and Matcher serialize their own state
+        items = self.db.get_items(type=vtype)
+        matches = self.matcher.find_matches_batch(items, topk=3)
+        icons = self._decode_images([(it['thumb_path'] or it['image_path'], ROW_ICON_SIZE) for it in items])
+        return items, matches, icons
+
+    def _fill_dashboard(self, seq, future):
+        if seq != self._dashboard_seq:
+            return
+        try:
+            items, all_matches, icons = future.result()
+        except Exception as e:
+            print('Match error', e)
+            return
+        self._decoded.update(icons)
+        # update rows in place; only rows whose items are gone are deleted
+        keep = {it['id'] for it in items}
+        stale = [iid for iid in self.match_tree.get_children() if iid not in keep]
+        if stale:
+            self.match_tree.delete(*stale)
+        self._dashboard_items = {it['id']: it for it in items}
+        self._dashboard_matches = {}
+        # rows get their images re-registered below before the old references are dropped
+        old_images, self._dashboard_images = self._dashboard_images, {}
+        for index, (it, matches) in enumerate(zip(items, all_matches)):
+            best = f"{matches[0]['_score']:.2f}" if matches else 'No matches'
+            row = dict(text=f"{it['type'].upper()} - {it['name']}", values=(it['date'], it['place'], best, it['contact']),
+                       image=self._row_icon(it['id'], it))
+            if self.match_tree.exists(it['id']):
+                self.match_tree.item(it['id'], **row)
+                self.match_tree.move(it['id'], '', index)
+            else:
+                self.match_tree.insert('', index, iid=it['id'], **row)
+            self._clear_match_children(it['id'])
+            if matches:
+                self._dashboard_matches[it['id']] = matches
+                if self.match_tree.item(it['id'], 'open'):
+                    self._fill_match_children(it['id'])
+                else:
+                    # match rows are only created when the item is expanded (see _on_match_open)
+                    self.match_tree.insert(it['id'], 'end', text='Loading matches...')
+        del old_images
+        self._decoded.clear()
+
+    def _write_pdf(self, item, fname):
+        # worker thread: matching and reportlab both stay off the Tk thread
+        generate_pdf_report(item, self.matcher.find_matches(item, topk=5), fname)
+
+    def _pdf_done(self, fname, future):
+        self.pdf_progress.stop()
+        self.pdf_progress.pack_forget()
+        self.pdf_button.config(state='normal')
+        try:
+            future.result()
+        except Exception as e:
+            messagebox.showerror('Error', str(e))
+            return
+        messagebox.showinfo('Saved', f'PDF saved: {fname}')
+
+    def _show_submit_matches(self, item, future):
+        try:
+            matches = future.result()
+        except Exception as e:
+            print('Match error', e)
+            return
+        if matches:
+            self.show_matches_popup(item, matches)
+
+    def _decode_images(self, wanted):
+        # decode the (path, size) pairs missing from the PhotoImage cache in parallel; returns {cache key: PIL image}
+        keys = []
+        for path, size in wanted:
+            if not path:
+                continue
+            try:
+                key = (path, os.path.getmtime(path), size)
+            except OSError:
+                continue
+            if key not in self._photo_cache and key not in keys:
+                keys.append(key)
+        futures = [self._decode_pool.submit(decode_image, path, size) for path, _, size in keys]
+        decoded = {}
+        for key, f in zip(keys, futures):
+            try:
+                decoded[key] = f.result()
+            except Exception as e:
+                print('Thumb error', e)
+        return decoded
+
+    def _on_match_action(self, action, win, match_id):
+        # Tcl passes the button's command words as strings: the action, then the _popup_matches key
+        match = self._popup_matches.get((win, match_id))
+        if match is None:
+            return
+        if action == 'email':
+            self.notify_by_email(match)
+        else:
+            self.notify_by_sms(match)
+
+    def _on_popup_destroy(self, event):
+        # <Destroy> also reaches the popup's children; only the window itself releases its matches
+        if not isinstance(event.widget, tk.Toplevel):
+            return
+        win = str(event.widget)
+        for key in [k for k in self._popup_matches if k[0] == win]:
+            del self._popup_matches[key]
+
+    def _photo(self, path, size):
+        # mtime in the key makes a replaced file miss instead of showing the old picture
+        key = (path, os.path.getmtime(path), size)
+        imgtk = self._photo_cache.get(key)
+        if imgtk is not None:
+            self._photo_cache.move_to_end(key)
+            return imgtk
+        img = self._decoded.pop(key, None)
+        if img is None:
+            img = decode_image(path, size)
+        imgtk = ImageTk.PhotoImage(img)
+        self._photo_cache[key] = imgtk
+        self._photo_cache_bytes += imgtk.width() * imgtk.height() * 4
+        while self._photo_cache_bytes > PHOTO_CACHE_BYTES and len(self._photo_cache) > 1:
+            _, old = self._photo_cache.popitem(last=False)
+            self._photo_cache_bytes -= old.width() * old.height() * 4
+        return imgtk
+
+    def _drop_widget_image(self, event):
+        # a destroyed label lets go of its PhotoImage right away instead of when the Python object is collected
+        if getattr(event.widget, 'img', None) is not None:
+            event.widget.img = None
+
+    def _row_icon(self, iid, it):
+        path = it['thumb_path'] or it['image_path']
+        if not path:
+            return ''
+        try:
+            imgtk = self._photo(path, ROW_ICON_SIZE)
+        except Exception as e:
+            print('Thumb error', e)
+            return ''
+        # the tree only knows the Tk image name, so keep the Python object alive while the row exists
+        self._dashboard_images[iid] = imgtk
+        return imgtk
+
+    def _on_match_open(self, event):
+        node = self.match_tree.focus()
+        if self.match_tree.parent(node) or node not in self._dashboard_matches:
+            return
+        self._fill_match_children(node)
+
+    def _fill_match_children(self, node):
+        self._clear_match_children(node)
+        for n, m in enumerate(self._dashboard_matches[node]):
+            iid = f'{node}/{n}'
+            self.match_tree.insert(node, 'end', iid=iid, text=f"{m['type'].title()} - {m['name']}",
+                                   values=(m['date'], m['place'], f"{m['_score']:.2f}", m['contact']), image=self._row_icon(iid, m))
+
+    def _on_match_close(self, event):
+        node = self.match_tree.focus()
+        if self.match_tree.parent(node) or node not in self._dashboard_matches:
+            return
+        # collapsed rows drop their match rows (and images); a placeholder keeps the expander
+        self._clear_match_children(node)
+        self.match_tree.insert(node, 'end', text='Loading matches...')
+
+    def _on_match_select(self, event):
+        sel = self.match_tree.selection()
+        if not sel:
+            return
+        node = sel[0]
+        parent = self.match_tree.parent(node)
+        if not parent:
+            if node in self._dashboard_items:
+                self._show_detail(self._dashboard_items[node], self._dashboard_matches.get(node, []), True)
+        elif '/' in node and parent in self._dashboard_matches:
+            # a match row: show that match on its own
+            self._show_detail(self._dashboard_matches[parent][int(node.rsplit('/', 1)[1])], [], False)
+
+    def _show_detail(self, it, matches, is_item):
+        self.detail_title.config(text=f"{it['type'].upper()} - {it['name']}")
+        self.detail_info.config(text=f"{it['date']} @ {it['place']} | Contact: {it['contact']}")
+        path = it['thumb_path'] or it['image_path']
+        if path:
+            self.show_thumbnail(path, widget=self.detail_img, size=(150,150))
+        else:
+            self.detail_img.img = None
+            self.detail_img.config(image='')
+        self.detail_desc.config(text=(it['description'] or '(No description)')[:400])
+        if matches:
+            self.detail_matches_label.config(text='Possible matches:')
+        else:
+            self.detail_matches_label.config(text='No matches found yet' if is_item else '')
+        # match rows are created once and reused for every selection
+        while len(self._detail_rows) < len(matches):
+            row = ttk.Frame(self.detail_matches)
+            mimg = ttk.Label(row)
+            mimg.pack(side='left')
+            lbl = ttk.Label(row, wraplength=220)
+            lbl.pack(side='left', padx=6)
+            self._detail_rows.append((row, mimg, lbl))
+        for n, (row, mimg, lbl) in enumerate(self._detail_rows):
+            if n >= len(matches):
+                row.pack_forget()
+                continue
+            m = matches[n]
+            row.pack(fill='x', pady=2)
+            mpath = m['thumb_path'] or m['image_path']
+            if mpath:
+                self.show_thumbnail(mpath, widget=mimg, size=(80,80))
+            else:
+                mimg.img = None
+                mimg.config(image='')
+            lbl.config(text=f"{m['type'].title()} - {m['name']}\nScore: {m['_score']:.2f} | Place: {m['place']}\nContact: {m['contact']}")
+
+    def _clear_match_children(self, node):
+        for child in self.match_tree.get_children(node):
+            self._dashboard_images.pop(child, None)
+            self.match_tree.delete(child)
 
     def common_clear_form(self):
         try:
@@ -333,6 +1037,7 @@ class AppBase:
             self.place_entry.delete(0,'end')
             self.contact_entry.delete(0,'end')
             self.selected_image_path = None
+            self.selected_thumb_path = None
             if hasattr(self,'img_label'):
                 self.img_label.config(image='')
         except Exception:
@@ -351,6 +1056,10 @@ if UI_BOOTSTRAP:
             self.create_widgets()
 
         def create_widgets(self):
+            self._configure_styles()
+            # one Tcl command for every Email/SMS button in match popups (see show_matches_popup)
+            self._match_action_cmd = self.register(self._on_match_action)
+            self.bind_class('PhotoLabel', '<Destroy>', self._drop_widget_image)
             nb = ttk.Notebook(self)
             nb.pack(fill='both', expand=True)
             self.form_frame = ttk.Frame(nb)
@@ -388,7 +1097,7 @@ if UI_BOOTSTRAP:
             top_search.pack(fill='x')
             ttk.Label(top_search, text='Search:').pack(side='left')
             self.search_var = tk.StringVar()
-            self.search_var.trace_add('write', lambda *args: self.refresh_list())
+            self.search_var.trace_add('write', self._schedule_refresh)
             ttk.Entry(top_search, textvariable=self.search_var, width=40).pack(side='left', padx=6)
             ttk.Button(top_search, text='Admin Login', command=self.admin_login).pack(side='right')
 
@@ -412,19 +1121,20 @@ if UI_BOOTSTRAP:
             ext = os.path.splitext(path)[1]
             newname = str(uuid.uuid4()) + ext
             newpath = os.path.join(IMAGES_DIR, newname)
-            shutil.copy(path, newpath)
+            newpath = store_image(path, newpath)
             self.selected_image_path = newpath
-            self.show_thumbnail(newpath)
+            self.selected_thumb_path = make_thumbnail(newpath)
+            self.show_thumbnail(self.selected_thumb_path or newpath)
 
         def show_thumbnail(self, path, widget=None, size=(150,150)):
             try:
-                img = Image.open(path)
-                img.thumbnail(size)
-                imgtk = ImageTk.PhotoImage(img)
+                imgtk = self._photo(path, size)
                 if widget is None:
                     self.img_label.img = imgtk
                     self.img_label.config(image=imgtk)
                 else:
+                    if 'PhotoLabel' not in widget.bindtags():
+                        widget.bindtags(widget.bindtags() + ('PhotoLabel',))
                     widget.img = imgtk
                     widget.config(image=imgtk)
             except Exception as e:
@@ -433,7 +1143,8 @@ if UI_BOOTSTRAP:
         def submit_item(self):
             itype = self.type_var.get()
             name = self.name_entry.get().strip()
-            desc = self.desc_text.get('1.0','end').strip()
+            # 'end' includes the trailing newline Tk always keeps; an empty widget is never copied out
+            desc = self.desc_text.get('1.0','end-1c').strip() if self.desc_text.compare('end-1c','!=','1.0') else ''
             place = self.place_entry.get().strip()
             contact = self.contact_entry.get().strip()
             date = datetime.date.today().isoformat()
@@ -449,22 +1160,22 @@ if UI_BOOTSTRAP:
                 'place': place,
                 'date': date,
                 'contact': contact,
-                'image_path': img
+                'image_path': img,
+                'thumb_path': self.selected_thumb_path
             }
             self.db.add_item(item)
+            future = self._match_pool.submit(self.matcher.find_matches, item, 5)
             messagebox.showinfo('Saved', 'Item saved to database')
-            matches = self.matcher.find_matches(item, topk=5)
-            if matches:
-                self.show_matches_popup(item, matches)
+            future.add_done_callback(lambda f: self.after(0, self._show_submit_matches, item, f))
             self.common_clear_form()
             self.refresh_list()
 
         def refresh_list(self):
-            for r in self.tree.get_children():
-                self.tree.delete(r)
             search = self.search_var.get().strip()
-            for it in self.db.get_items(search=search):
-                self.tree.insert('', 'end', values=(it['type'], it['name'][:30], it['place'][:20], it['date'], it['contact'][:20]))
+            self._search_seq += 1
+            seq = self._search_seq
+            future = self._search_pool.submit(self._search_rows, search)
+            future.add_done_callback(lambda f: self.after(0, self._fill_list, seq, f))
 
         def build_dashboard(self):
             frm = self.dashboard_frame
@@ -472,60 +1183,58 @@ if UI_BOOTSTRAP:
             top.pack(fill='x')
             ttk.Label(top, text='View matches for:').pack(side='left')
             self.view_type = tk.StringVar(value='lost')
+            self.view_type.trace_add('write', self._schedule_dashboard)
             ttk.Radiobutton(top, text='Lost', variable=self.view_type, value='lost').pack(side='left')
             ttk.Radiobutton(top, text='Found', variable=self.view_type, value='found').pack(side='left')
             ttk.Button(top, text='Refresh Matches', command=self.populate_matches).pack(side='left', padx=10)
-            ttk.Button(top, text='Generate PDF for Selected', command=self.generate_pdf_for_selected).pack(side='right')
-
-            self.matches_canvas = tk.Canvas(frm)
-            self.matches_canvas.pack(side='left', fill='both', expand=True)
-            self.match_frame = ttk.Frame(self.matches_canvas)
-            self.vsb = ttk.Scrollbar(frm, orient='vertical', command=self.matches_canvas.yview)
+            self.pdf_button = ttk.Button(top, text='Generate PDF for Selected', command=self.generate_pdf_for_selected)
+            self.pdf_button.pack(side='right')
+            # shown only while a report is being written
+            self.pdf_progress = ttk.Progressbar(top, mode='indeterminate', length=120)
+
+            # detail pane for the selected row; its widgets are created once and reconfigured
+            self.detail_frame = ttk.Frame(frm, padding=10, width=340)
+            self.detail_frame.pack(side='right', fill='y')
+            self.detail_frame.pack_propagate(False)
+            self.detail_title = ttk.Label(self.detail_frame, text='Select an item to see its details', style='Title.TLabel', wraplength=320)
+            self.detail_title.pack(anchor='w')
+            self.detail_info = ttk.Label(self.detail_frame, wraplength=320)
+            self.detail_info.pack(anchor='w', pady=(2,0))
+            self.detail_img = ttk.Label(self.detail_frame)
+            self.detail_img.pack(anchor='w', pady=6)
+            self.detail_desc = ttk.Label(self.detail_frame, wraplength=320)
+            self.detail_desc.pack(anchor='w')
+            self.detail_matches = ttk.Frame(self.detail_frame)
+            self.detail_matches.pack(fill='x', pady=(10,0))
+            self.detail_matches_label = ttk.Label(self.detail_matches, style='Match.TLabel')
+            self.detail_matches_label.pack(anchor='w')
+            self._detail_rows = []
+
+            self.match_tree = ttk.Treeview(frm, columns=('date','place','score','contact'), show='tree headings', style='Dashboard.Treeview')
+            self.match_tree.heading('#0', text='Item')
+            self.match_tree.column('#0', width=360)
+            for c in ('date','place','score','contact'):
+                self.match_tree.heading(c, text=c.title())
+                self.match_tree.column(c, width=120)
+            self.vsb = ttk.Scrollbar(frm, orient='vertical', command=self.match_tree.yview)
             self.vsb.pack(side='right', fill='y')
-            self.matches_canvas.configure(yscrollcommand=self.vsb.set)
-            self.matches_canvas.create_window((0,0), window=self.match_frame, anchor='nw')
-            self.match_frame.bind('<Configure>', lambda e: self.matches_canvas.configure(scrollregion=self.matches_canvas.bbox('all')))
+            self.match_tree.configure(yscrollcommand=self.vsb.set)
+            self.match_tree.pack(side='left', fill='both', expand=True)
+            self.match_tree.bind('<<TreeviewOpen>>', self._on_match_open)
+            self.match_tree.bind('<<TreeviewClose>>', self._on_match_close)
+            self.match_tree.bind('<<TreeviewSelect>>', self._on_match_select)
 
         def populate_matches(self):
-            for w in self.match_frame.winfo_children():
-                w.destroy()
-            vtype = self.view_type.get()
-            items = self.db.get_items(type=vtype)
-            for it in items:
-                container = ttk.Frame(self.match_frame, borderwidth=1, relief='solid', padding=6)
-                container.pack(fill='x', pady=4, padx=4)
-                top = ttk.Frame(container)
-                top.pack(fill='x')
-                ttk.Label(top, text=f"{it['type'].upper()} - {it['name']}", font=('TkDefaultFont', 12, 'bold')).pack(side='left')
-                ttk.Label(top, text=f"{it['date']} @ {it['place']}").pack(side='right')
-                mid = ttk.Frame(container)
-                mid.pack(fill='x', pady=4)
-                img_lbl = ttk.Label(mid)
-                img_lbl.pack(side='left')
-                if it['image_path']:
-                    self.show_thumbnail(it['image_path'], widget=img_lbl, size=(120,120))
-                text = ttk.Label(mid, text=(it['description'] or '(No description)')[:200], wraplength=600)
-                text.pack(side='left', padx=10)
-                matches = self.matcher.find_matches(it, topk=3)
-                if matches:
-                    ttk.Separator(container, orient='horizontal').pack(fill='x', pady=4)
-                    ttk.Label(container, text='Possible matches:', foreground='blue').pack(anchor='w')
-                    for m in matches:
-                        row = ttk.Frame(container)
-                        row.pack(fill='x', pady=2)
-                        mimg = ttk.Label(row)
-                        mimg.pack(side='left')
-                        if m['image_path']:
-                            self.show_thumbnail(m['image_path'], widget=mimg, size=(80,80))
-                        lbl = ttk.Label(row, text=f"{m['type'].title()} - {m['name']} | Score: {m['_score']:.2f} | Place: {m['place']} | Contact: {m['contact']}", wraplength=700)
-                        lbl.pack(side='left', padx=6)
-                else:
-                    ttk.Label(container, text='No matches found yet').pack()
+            self._dashboard_seq += 1
+            seq = self._dashboard_seq
+            future = self._match_pool.submit(self._match_rows, self.view_type.get())
+            future.add_done_callback(lambda f: self.after(0, self._fill_dashboard, seq, f))
 
         def show_matches_popup(self, item, matches):
             win = tk.Toplevel(self)
             win.title('Possible Matches')
-            ttk.Label(win, text=f"Submitted: {item['type'].title()} - {item['name']}").pack(pady=4)
+            win.bind('<Destroy>', self._on_popup_destroy)
+            ttk.Label(win, text=f"Submitted: {item['type'].title()} - {item['name']}", style='Title.TLabel').pack(pady=4)
             for m in matches:
                 frm = ttk.Frame(win, padding=6, borderwidth=1, relief='ridge')
                 frm.pack(fill='x', padx=6, pady=4)
@@ -534,11 +1243,13 @@ if UI_BOOTSTRAP:
                 if m['image_path']:
                     mimg = ttk.Label(frm)
                     mimg.pack(side='right')
-                    self.show_thumbnail(m['image_path'], widget=mimg, size=(80,80))
+                    self.show_thumbnail(m['thumb_path'] or m['image_path'], widget=mimg, size=(80,80))
                 btn_frame = ttk.Frame(frm)
                 btn_frame.pack(side='right')
-                ttk.Button(btn_frame, text='Email', command=lambda mm=m: self.notify_by_email(mm)).pack(side='left', padx=2)
-                ttk.Button(btn_frame, text='SMS', command=lambda mm=m: self.notify_by_sms(mm)).pack(side='left', padx=2)
+                key = (str(win), m['id'])
+                self._popup_matches[key] = m
+                for text, action in (('Email', 'email'), ('SMS', 'sms')):
+                    ttk.Button(btn_frame, text=text, command=(self._match_action_cmd, action) + key).pack(side='left', padx=2)
 
         def notify_by_email(self, match):
             to_email = match.get('contact')
@@ -564,19 +1275,18 @@ if UI_BOOTSTRAP:
             if not items:
                 messagebox.showwarning('No items', 'No items to generate report for')
                 return
-            item = items[0]
-            matches = self.matcher.find_matches(item, topk=5)
+            item = dict(items[0])
             if not REPORTLAB_AVAILABLE:
                 messagebox.showerror('Missing', 'reportlab not installed. Install with pip install reportlab')
                 return
             fname = filedialog.asksaveasfilename(defaultextension='.pdf', filetypes=[('PDF Files','*.pdf')])
             if not fname:
                 return
-            try:
-                generate_pdf_report(item, matches, fname)
-                messagebox.showinfo('Saved', f'PDF saved: {fname}')
-            except Exception as e:
-                messagebox.showerror('Error', str(e))
+            self.pdf_button.config(state='disabled')
+            self.pdf_progress.pack(side='right', padx=6)
+            self.pdf_progress.start(10)
+            future = self._match_pool.submit(self._write_pdf, item, fname)
+            future.add_done_callback(lambda f: self.after(0, self._pdf_done, fname, f))
 
         def open_settings(self):
             SettingsDialog(self, self.settings)
@@ -670,21 +1380,25 @@ if UI_BOOTSTRAP:
             ttk.Button(self, text='Save Settings', command=self.save).pack(pady=8)
 
         def save(self):
-            self.settings.data['smtp']['enabled'] = bool(self.smtp_enabled.get())
-            self.settings.data['smtp']['host'] = self.smtp_host.get().strip()
-            try:
-                self.settings.data['smtp']['port'] = int(self.smtp_port.get().strip())
-            except Exception:
-                self.settings.data['smtp']['port'] = 587
-            self.settings.data['smtp']['username'] = self.smtp_user.get().strip()
-            self.settings.data['smtp']['password'] = self.smtp_pass.get().strip()
-            self.settings.data['smtp']['from_email'] = self.smtp_from.get().strip()
-            self.settings.data['twilio']['enabled'] = bool(self.tw_enabled.get())
-            self.settings.data['twilio']['account_sid'] = self.tw_sid.get().strip()
-            self.settings.data['twilio']['auth_token'] = self.tw_auth.get().strip()
-            self.settings.data['twilio']['from_number'] = self.tw_from.get().strip()
-            self.settings.data['ui']['theme'] = self.ui_theme.get().strip()
-            self.settings.data['ui']['dark'] = bool(self.dark_var.get())
+            port = self.smtp_port.get().strip()
+            self.settings.update('smtp', {
+                'enabled': bool(self.smtp_enabled.get()),
+                'host': self.smtp_host.get().strip(),
+                'port': int(port) if port.isdecimal() else 587,
+                'username': self.smtp_user.get().strip(),
+                'password': self.smtp_pass.get().strip(),
+                'from_email': self.smtp_from.get().strip(),
+            })
+            self.settings.update('twilio', {
+                'enabled': bool(self.tw_enabled.get()),
+                'account_sid': self.tw_sid.get().strip(),
+                'auth_token': self.tw_auth.get().strip(),
+                'from_number': self.tw_from.get().strip(),
+            })
+            self.settings.update('ui', {
+                'theme': self.ui_theme.get().strip(),
+                'dark': bool(self.dark_var.get()),
+            })
             self.settings.save()
             messagebox.showinfo('Saved','Settings saved. Restart app for theme changes to take full effect.')
             self.destroy()
@@ -700,6 +1414,10 @@ else:
             self.create_widgets()
 
         def create_widgets(self):
+            self._configure_styles()
+            # one Tcl command for every Email/SMS button in match popups (see show_matches_popup)
+            self._match_action_cmd = self.register(self._on_match_action)
+            self.bind_class('PhotoLabel', '<Destroy>', self._drop_widget_image)
             notebook = ttk.Notebook(self)
             notebook.pack(fill='both', expand=True)
             self.form_frame = ttk.Frame(notebook)
@@ -737,7 +1455,7 @@ else:
             top_search.pack(fill='x')
             ttk.Label(top_search, text='Search:').pack(side='left')
             self.search_var = tk.StringVar()
-            self.search_var.trace_add('write', lambda *args: self.refresh_list())
+            self.search_var.trace_add('write', self._schedule_refresh)
             ttk.Entry(top_search, textvariable=self.search_var, width=40).pack(side='left', padx=6)
             ttk.Button(top_search, text='Admin Login', command=self.admin_login).pack(side='right')
 
@@ -761,19 +1479,20 @@ else:
             ext = os.path.splitext(path)[1]
             newname = str(uuid.uuid4()) + ext
             newpath = os.path.join(IMAGES_DIR, newname)
-            shutil.copy(path, newpath)
+            newpath = store_image(path, newpath)
             self.selected_image_path = newpath
-            self.show_thumbnail(newpath)
+            self.selected_thumb_path = make_thumbnail(newpath)
+            self.show_thumbnail(self.selected_thumb_path or newpath)
 
         def show_thumbnail(self, path, widget=None, size=(150,150)):
             try:
-                img = Image.open(path)
-                img.thumbnail(size)
-                imgtk = ImageTk.PhotoImage(img)
+                imgtk = self._photo(path, size)
                 if widget is None:
                     self.img_label.img = imgtk
                     self.img_label.config(image=imgtk)
                 else:
+                    if 'PhotoLabel' not in widget.bindtags():
+                        widget.bindtags(widget.bindtags() + ('PhotoLabel',))
                     widget.img = imgtk
                     widget.config(image=imgtk)
             except Exception as e:
@@ -782,7 +1501,8 @@ else:
         def submit_item(self):
             itype = self.type_var.get()
             name = self.name_entry.get().strip()
-            desc = self.desc_text.get('1.0','end').strip()
+            # 'end' includes the trailing newline Tk always keeps; an empty widget is never copied out
+            desc = self.desc_text.get('1.0','end-1c').strip() if self.desc_text.compare('end-1c','!=','1.0') else ''
             place = self.place_entry.get().strip()
             contact = self.contact_entry.get().strip()
             date = datetime.date.today().isoformat()
@@ -798,22 +1518,22 @@ else:
                 'place': place,
                 'date': date,
                 'contact': contact,
-                'image_path': img
+                'image_path': img,
+                'thumb_path': self.selected_thumb_path
             }
             self.db.add_item(item)
+            future = self._match_pool.submit(self.matcher.find_matches, item, 5)
             messagebox.showinfo('Saved', 'Item saved to database')
-            matches = self.matcher.find_matches(item, topk=5)
-            if matches:
-                self.show_matches_popup(item, matches)
+            future.add_done_callback(lambda f: self.after(0, self._show_submit_matches, item, f))
             self.common_clear_form()
             self.refresh_list()
 
         def refresh_list(self):
-            for r in self.tree.get_children():
-                self.tree.delete(r)
             search = self.search_var.get().strip()
-            for it in self.db.get_items(search=search):
-                self.tree.insert('', 'end', values=(it['type'], it['name'][:30], it['place'][:20], it['date'], it['contact'][:20]))
+            self._search_seq += 1
+            seq = self._search_seq
+            future = self._search_pool.submit(self._search_rows, search)
+            future.add_done_callback(lambda f: self.after(0, self._fill_list, seq, f))
 
         def build_dashboard(self):
             frm = self.dashboard_frame
@@ -821,60 +1541,58 @@ else:
             top.pack(fill='x')
             ttk.Label(top, text='View matches for:').pack(side='left')
             self.view_type = tk.StringVar(value='lost')
+            self.view_type.trace_add('write', self._schedule_dashboard)
             ttk.Radiobutton(top, text='Lost', variable=self.view_type, value='lost').pack(side='left')
             ttk.Radiobutton(top, text='Found', variable=self.view_type, value='found').pack(side='left')
             ttk.Button(top, text='Refresh Matches', command=self.populate_matches).pack(side='left', padx=10)
-            ttk.Button(top, text='Generate PDF for Selected', command=self.generate_pdf_for_selected).pack(side='right')
-
-            self.matches_canvas = tk.Canvas(frm)
-            self.matches_canvas.pack(side='left', fill='both', expand=True)
-            self.match_frame = ttk.Frame(self.matches_canvas)
-            self.vsb = ttk.Scrollbar(frm, orient='vertical', command=self.matches_canvas.yview)
+            self.pdf_button = ttk.Button(top, text='Generate PDF for Selected', command=self.generate_pdf_for_selected)
+            self.pdf_button.pack(side='right')
+            # shown only while a report is being written
+            self.pdf_progress = ttk.Progressbar(top, mode='indeterminate', length=120)
+
+            # detail pane for the selected row; its widgets are created once and reconfigured
+            self.detail_frame = ttk.Frame(frm, padding=10, width=340)
+            self.detail_frame.pack(side='right', fill='y')
+            self.detail_frame.pack_propagate(False)
+            self.detail_title = ttk.Label(self.detail_frame, text='Select an item to see its details', style='Title.TLabel', wraplength=320)
+            self.detail_title.pack(anchor='w')
+            self.detail_info = ttk.Label(self.detail_frame, wraplength=320)
+            self.detail_info.pack(anchor='w', pady=(2,0))
+            self.detail_img = ttk.Label(self.detail_frame)
+            self.detail_img.pack(anchor='w', pady=6)
+            self.detail_desc = ttk.Label(self.detail_frame, wraplength=320)
+            self.detail_desc.pack(anchor='w')
+            self.detail_matches = ttk.Frame(self.detail_frame)
+            self.detail_matches.pack(fill='x', pady=(10,0))
+            self.detail_matches_label = ttk.Label(self.detail_matches, style='Match.TLabel')
+            self.detail_matches_label.pack(anchor='w')
+            self._detail_rows = []
+
+            self.match_tree = ttk.Treeview(frm, columns=('date','place','score','contact'), show='tree headings', style='Dashboard.Treeview')
+            self.match_tree.heading('#0', text='Item')
+            self.match_tree.column('#0', width=360)
+            for c in ('date','place','score','contact'):
+                self.match_tree.heading(c, text=c.title())
+                self.match_tree.column(c, width=120)
+            self.vsb = ttk.Scrollbar(frm, orient='vertical', command=self.match_tree.yview)
             self.vsb.pack(side='right', fill='y')
-            self.matches_canvas.configure(yscrollcommand=self.vsb.set)
-            self.matches_canvas.create_window((0,0), window=self.match_frame, anchor='nw')
-            self.match_frame.bind('<Configure>', lambda e: self.matches_canvas.configure(scrollregion=self.matches_canvas.bbox('all')))
+            self.match_tree.configure(yscrollcommand=self.vsb.set)
+            self.match_tree.pack(side='left', fill='both', expand=True)
+            self.match_tree.bind('<<TreeviewOpen>>', self._on_match_open)
+            self.match_tree.bind('<<TreeviewClose>>', self._on_match_close)
+            self.match_tree.bind('<<TreeviewSelect>>', self._on_match_select)
 
         def populate_matches(self):
-            for w in self.match_frame.winfo_children():
-                w.destroy()
-            vtype = self.view_type.get()
-            items = self.db.get_items(type=vtype)
-            for it in items:
-                container = ttk.Frame(self.match_frame, borderwidth=1, relief='solid', padding=6)
-                container.pack(fill='x', pady=4, padx=4)
-                top = ttk.Frame(container)
-                top.pack(fill='x')
-                ttk.Label(top, text=f"{it['type'].upper()} - {it['name']}", font=('TkDefaultFont', 12, 'bold')).pack(side='left')
-                ttk.Label(top, text=f"{it['date']} @ {it['place']}").pack(side='right')
-                mid = ttk.Frame(container)
-                mid.pack(fill='x', pady=4)
-                img_lbl = ttk.Label(mid)
-                img_lbl.pack(side='left')
-                if it['image_path']:
-                    self.show_thumbnail(it['image_path'], widget=img_lbl, size=(120,120))
-                text = ttk.Label(mid, text=(it['description'] or '(No description)')[:200], wraplength=600)
-                text.pack(side='left', padx=10)
-                matches = self.matcher.find_matches(it, topk=3)
-                if matches:
-                    ttk.Separator(container, orient='horizontal').pack(fill='x', pady=4)
-                    ttk.Label(container, text='Possible matches:', foreground='blue').pack(anchor='w')
-                    for m in matches:
-                        row = ttk.Frame(container)
-                        row.pack(fill='x', pady=2)
-                        mimg = ttk.Label(row)
-                        mimg.pack(side='left')
-                        if m['image_path']:
-                            self.show_thumbnail(m['image_path'], widget=mimg, size=(80,80))
-                        lbl = ttk.Label(row, text=f"{m['type'].title()} - {m['name']} | Score: {m['_score']:.2f} | Place: {m['place']} | Contact: {m['contact']}", wraplength=700)
-                        lbl.pack(side='left', padx=6)
-                else:
-                    ttk.Label(container, text='No matches found yet').pack()
+            self._dashboard_seq += 1
+            seq = self._dashboard_seq
+            future = self._match_pool.submit(self._match_rows, self.view_type.get())
+            future.add_done_callback(lambda f: self.after(0, self._fill_dashboard, seq, f))
 
         def show_matches_popup(self, item, matches):
             win = tk.Toplevel(self)
             win.title('Possible Matches')
-            ttk.Label(win, text=f"Submitted: {item['type'].title()} - {item['name']}").pack(pady=4)
+            win.bind('<Destroy>', self._on_popup_destroy)
+            ttk.Label(win, text=f"Submitted: {item['type'].title()} - {item['name']}", style='Title.TLabel').pack(pady=4)
             for m in matches:
                 frm = ttk.Frame(win, padding=6, borderwidth=1, relief='ridge')
                 frm.pack(fill='x', padx=6, pady=4)
@@ -883,11 +1601,13 @@ else:
                 if m['image_path']:
                     mimg = ttk.Label(frm)
                     mimg.pack(side='right')
-                    self.show_thumbnail(m['image_path'], widget=mimg, size=(80,80))
+                    self.show_thumbnail(m['thumb_path'] or m['image_path'], widget=mimg, size=(80,80))
                 btn_frame = ttk.Frame(frm)
                 btn_frame.pack(side='right')
-                ttk.Button(btn_frame, text='Email', command=lambda mm=m: self.notify_by_email(mm)).pack(side='left', padx=2)
-                ttk.Button(btn_frame, text='SMS', command=lambda mm=m: self.notify_by_sms(mm)).pack(side='left', padx=2)
+                key = (str(win), m['id'])
+                self._popup_matches[key] = m
+                for text, action in (('Email', 'email'), ('SMS', 'sms')):
+                    ttk.Button(btn_frame, text=text, command=(self._match_action_cmd, action) + key).pack(side='left', padx=2)
 
         def notify_by_email(self, match):
             to_email = match.get('contact')
@@ -913,19 +1633,18 @@ else:
             if not items:
                 messagebox.showwarning('No items', 'No items to generate report for')
                 return
-            item = items[0]
-            matches = self.matcher.find_matches(item, topk=5)
+            item = dict(items[0])
             if not REPORTLAB_AVAILABLE:
                 messagebox.showerror('Missing', 'reportlab not installed. Install with pip install reportlab')
                 return
             fname = filedialog.asksaveasfilename(defaultextension='.pdf', filetypes=[('PDF Files','*.pdf')])
             if not fname:
                 return
-            try:
-                generate_pdf_report(item, matches, fname)
-                messagebox.showinfo('Saved', f'PDF saved: {fname}')
-            except Exception as e:
-                messagebox.showerror('Error', str(e))
+            self.pdf_button.config(state='disabled')
+            self.pdf_progress.pack(side='right', padx=6)
+            self.pdf_progress.start(10)
+            future = self._match_pool.submit(self._write_pdf, item, fname)
+            future.add_done_callback(lambda f: self.after(0, self._pdf_done, fname, f))
 
         def open_settings(self):
             SettingsDialog(self, self.settings)
@@ -1019,21 +1738,25 @@ else:
             ttk.Button(self, text='Save Settings', command=self.save).pack(pady=8)
 
         def save(self):
-            self.settings.data['smtp']['enabled'] = bool(self.smtp_enabled.get())
-            self.settings.data['smtp']['host'] = self.smtp_host.get().strip()
-            try:
-                self.settings.data['smtp']['port'] = int(self.smtp_port.get().strip())
-            except Exception:
-                self.settings.data['smtp']['port'] = 587
-            self.settings.data['smtp']['username'] = self.smtp_user.get().strip()
-            self.settings.data['smtp']['password'] = self.smtp_pass.get().strip()
-            self.settings.data['smtp']['from_email'] = self.smtp_from.get().strip()
-            self.settings.data['twilio']['enabled'] = bool(self.tw_enabled.get())
-            self.settings.data['twilio']['account_sid'] = self.tw_sid.get().strip()
-            self.settings.data['twilio']['auth_token'] = self.tw_auth.get().strip()
-            self.settings.data['twilio']['from_number'] = self.tw_from.get().strip()
-            self.settings.data['ui']['theme'] = self.ui_theme.get().strip()
-            self.settings.data['ui']['dark'] = bool(self.dark_var.get())
+            port = self.smtp_port.get().strip()
+            self.settings.update('smtp', {
+                'enabled': bool(self.smtp_enabled.get()),
+                'host': self.smtp_host.get().strip(),
+                'port': int(port) if port.isdecimal() else 587,
+                'username': self.smtp_user.get().strip(),
+                'password': self.smtp_pass.get().strip(),
+                'from_email': self.smtp_from.get().strip(),
+            })
+            self.settings.update('twilio', {
+                'enabled': bool(self.tw_enabled.get()),
+                'account_sid': self.tw_sid.get().strip(),
+                'auth_token': self.tw_auth.get().strip(),
+                'from_number': self.tw_from.get().strip(),
+            })
+            self.settings.update('ui', {
+                'theme': self.ui_theme.get().strip(),
+                'dark': bool(self.dark_var.get()),
+            })
             self.settings.save()
             messagebox.showinfo('Saved','Settings saved.')
             self.destroy()